@@ -1,11 +1,31 @@
 """Flask application factory for Knowledge Corpus Manager."""
 
 from flask import Flask
+from sqlalchemy import event
 
 from app.config import load_config
+from app.indexer import compile_skip_patterns
 from app.models import db
 
 
+def _set_sqlite_pragmas(dbapi_conn, _connection_record) -> None:
+    """Tune each new SQLite connection for concurrent reads during indexing.
+
+    WAL lets browse/search readers proceed while the indexer writes, and
+    synchronous=NORMAL is safe under WAL while avoiding an fsync per commit.
+    journal_mode is persisted in the database file, so setup_db.py (which
+    goes through create_app) leaves new databases in WAL mode. Only
+    registered for the SQLite backend.
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
 def create_app(config_override: dict | None = None) -> Flask:
     """Create and configure the Flask application.
 
@@ -24,13 +44,28 @@ def create_app(config_override: dict | None = None) -> Flask:
     )
     app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{cfg['database']['path']}"
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # SQLAlchemy caches compiled SQL per statement shape; each combination of
+    # search filters, sort order and cursor is a distinct shape, so allow
+    # more than the default 500 entries.
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"query_cache_size": 1200}
+    app.config["USE_X_SENDFILE"] = cfg["server"].get("use_x_sendfile", False)
     app.config["KCM"] = cfg
 
+    # Normalize indexer filters once instead of on every walk
+    indexer_cfg = cfg["indexer"]
+    indexer_cfg["supported_extensions"] = frozenset(
+        e.lower() for e in indexer_cfg["supported_extensions"]
+    )
+    indexer_cfg["skip_patterns_compiled"] = compile_skip_patterns(indexer_cfg["skip_patterns"])
+
     if config_override:
         app.config.update(config_override)
 
     # Initialize database
     db.init_app(app)
+    if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        with app.app_context():
+            event.listen(db.engine, "connect", _set_sqlite_pragmas)
 
     # Register blueprints
     from app.routes.main import main_bp
@@ -0,0 +1,116 @@
+"""In-process caching support for data derived from the file index.
+
+Cached values are keyed on a corpus generation number that the indexer
+bumps after writing, so they are invalidated whenever the index changes.
+The generation only covers writes made by this process; cached values also
+expire after CACHE_TTL seconds so index runs from the CLI or another worker
+show up without a restart.
+"""
+
+import functools
+import itertools
+import time
+
+from sqlalchemy import func, literal, select, union_all
+
+from app.models import File, db
+
+# Seconds a cached value may be served before it is recomputed
+CACHE_TTL = 60
+
+_generations = itertools.count()
+_corpus_generation = next(_generations)
+
+
+def corpus_generation() -> int:
+    """Return the current corpus generation number."""
+    return _corpus_generation
+
+
+def bump_corpus_generation() -> int:
+    """Invalidate index-derived caches after the files table changes.
+
+    Returns:
+        The new generation number.
+    """
+    global _corpus_generation
+    _corpus_generation = next(_generations)
+    return _corpus_generation
+
+
+def cache_key() -> tuple[str, int, int]:
+    """Key shared by index-derived caches: database URL, generation and TTL window."""
+    return str(db.engine.url), corpus_generation(), int(time.monotonic() // CACHE_TTL)
+
+
+@functools.lru_cache(maxsize=4)
+def _filter_options(db_url: str, generation: int, ttl_bucket: int) -> tuple[tuple, tuple]:
+    """Return the sorted distinct (extensions, sections) for the filter dropdowns.
+
+    Arguments are the cache_key() parts and are only used to key the LRU
+    cache, so a new generation or TTL window recomputes the lists.
+    """
+    # Both distinct lists in one round trip, tagged with which one each row belongs to
+    extensions = select(literal("ext").label("kind"), File.file_extension.label("value")).distinct()
+    sections = (
+        select(literal("section").label("kind"), File.corpus_section.label("value"))
+        .where(File.corpus_section.isnot(None))
+        .distinct()
+    )
+    rows = db.session.execute(union_all(extensions, sections).order_by("kind", "value")).all()
+    return (
+        tuple(r.value for r in rows if r.kind == "ext"),
+        tuple(r.value for r in rows if r.kind == "section"),
+    )
+
+
+def get_extensions() -> list[str]:
+    """Return the sorted distinct file extensions in the index."""
+    return list(_filter_options(*cache_key())[0])
+
+
+def get_sections() -> list[str]:
+    """Return the sorted distinct corpus sections in the index."""
+    return list(_filter_options(*cache_key())[1])
+
+
+@functools.lru_cache(maxsize=4)
+def _corpus_stats(db_url: str, generation: int, ttl_bucket: int) -> dict:
+    """Return the aggregates behind corpus_stats(), with hashable count tuples.
+
+    Keyed like _filter_options(): a generation bump or a new TTL window
+    misses the cache and re-runs the queries. Callers must copy the dict.
+    """
+    total_files, total_size, last_indexed = db.session.query(
+        func.count(File.id), func.sum(File.file_size_bytes), func.max(File.indexed_at)
+    ).one()
+    ext_counts = (
+        db.session.query(File.file_extension, func.count(File.id))
+        .group_by(File.file_extension)
+        .order_by(func.count(File.id).desc())
+        .all()
+    )
+    section_counts = (
+        db.session.query(File.corpus_section, func.count(File.id))
+        .group_by(File.corpus_section)
+        .order_by(func.count(File.id).desc())
+        .all()
+    )
+    return {
+        "total_files": total_files or 0,
+        "total_size": total_size or 0,
+        "last_indexed": last_indexed,
+        "ext_counts": tuple(tuple(r) for r in ext_counts),
+        "section_counts": tuple(tuple(r) for r in section_counts),
+    }
+
+
+def corpus_stats() -> dict:
+    """Return aggregate statistics for the indexed corpus.
+
+    Returns:
+        Dictionary with keys: total_files, total_size, last_indexed, and
+        ext_counts / section_counts as (value, count) pairs ordered by
+        count descending.
+    """
+    return dict(_corpus_stats(*cache_key()))
@@ -3,6 +3,8 @@
 Loads settings from config.yaml with environment variable overrides.
 """
 
+import copy
+import functools
 import os
 from pathlib import Path
 
@@ -18,18 +20,25 @@ DEFAULT_CONFIG = {
     },
     "consolidation": {
         "output_dir": str(Path.home() / ".kcm" / "exports"),
+        "background": True,
     },
     "server": {
         "host": "127.0.0.1",
         "port": 5000,
         "debug": True,
+        # Let a fronting web server (e.g. nginx X-Sendfile) serve downloads
+        "use_x_sendfile": False,
     },
     "indexer": {
         "skip_patterns": ["~$*", "*.tmp", "Thumbs.db", ".DS_Store"],
         "supported_extensions": [".md", ".docx", ".xlsx", ".pdf", ".vsdx", ".txt", ".csv"],
+        "parallel_hash": True,
     },
 }
 
+# libyaml-backed loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 # Maps environment variable names to config paths
 ENV_OVERRIDES: dict[str, tuple[str, str]] = {
     "KCM_CORPUS_ROOT": ("corpus", "root_path"),
@@ -39,7 +48,12 @@ ENV_OVERRIDES: dict[str, tuple[str, str]] = {
 
 
 def _deep_merge(base: dict, override: dict) -> dict:
-    """Recursively merge override dict into base dict."""
+    """Recursively merge override dict into base dict.
+
+    Subtrees that are not overridden are shared with base, not copied.
+    """
+    if not override:
+        return base
     result = base.copy()
     for key, value in override.items():
         if key in result and isinstance(result[key], dict) and isinstance(value, dict):
@@ -49,6 +63,27 @@ def _deep_merge(base: dict, override: dict) -> dict:
     return result
 
 
+@functools.lru_cache(maxsize=8)
+def _load_file_config(config_path: str, mtime_ns: int | None) -> dict:
+    """Merge the YAML config file over the defaults.
+
+    Cached on the file's path and modification time, so repeated loads skip
+    YAML parsing until the file changes.
+
+    Args:
+        config_path: Path to config.yaml.
+        mtime_ns: Modification time of the file, or None if it does not exist.
+
+    Returns:
+        Merged configuration dictionary. Callers must not mutate it.
+    """
+    if mtime_ns is None:
+        return DEFAULT_CONFIG
+    with open(config_path, "r") as f:
+        yaml_config = yaml.load(f, Loader=_YAML_LOADER) or {}
+    return _deep_merge(DEFAULT_CONFIG, yaml_config)
+
+
 def load_config(config_path: str | None = None) -> dict:
     """Load configuration from YAML file with environment variable overrides.
 
@@ -58,18 +93,14 @@ def load_config(config_path: str | None = None) -> dict:
     Returns:
         Merged configuration dictionary.
     """
-    config = DEFAULT_CONFIG.copy()
-    config = _deep_merge(DEFAULT_CONFIG, {})
-
-    # Load YAML config if it exists
     if config_path is None:
         config_path = str(Path(__file__).parent.parent / "config.yaml")
 
     yaml_path = Path(config_path)
-    if yaml_path.exists():
-        with open(yaml_path, "r") as f:
-            yaml_config = yaml.safe_load(f) or {}
-        config = _deep_merge(config, yaml_config)
+    mtime_ns = yaml_path.stat().st_mtime_ns if yaml_path.exists() else None
+
+    # The cached tree is shared, so work on a private copy
+    config = copy.deepcopy(_load_file_config(str(yaml_path), mtime_ns))
 
     # Apply environment variable overrides
     for env_var, (section, key) in ENV_OVERRIDES.items():
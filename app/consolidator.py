@@ -3,13 +3,20 @@
 Supports markdown, JSON, and plain text output formats.
 """
 
+import heapq
+import io
 import json
+import re
 from datetime import datetime, timezone
+from operator import attrgetter
 from pathlib import Path
+from typing import Iterable, Iterator, TextIO
 
+from sqlalchemy import Row, func, select
 from sqlalchemy.orm import Session
 
-from app.models import ConsolidationJob, File
+from app.models import ConsolidationJob, File, file_to_dict
+from app.utils import chunked
 
 
 def _format_size(size_bytes: int) -> str:
@@ -21,46 +28,107 @@ def _format_size(size_bytes: int) -> str:
     return f"{size_bytes:.1f} TB"
 
 
-def consolidate_markdown(files: list[File], name: str) -> str:
-    """Generate a markdown consolidation report.
+def _markdown_key(f) -> tuple[str, str]:
+    """Sort key for markdown reports: section, then path."""
+    return (f.corpus_section or "(root)", f.file_path)
+
+
+def _text_key(f) -> str:
+    """Sort key for text manifests: path."""
+    return f.file_path
+
+
+def consolidate_markdown_stream(files: Iterable, name: str, file_count: int, fp: TextIO) -> None:
+    """Write a markdown consolidation report to a text stream.
 
     Args:
-        files: List of File model instances.
+        files: File instances or rows, ordered by section ("(root)" for
+            files without one) and then by path.
         name: Name/label for the consolidation.
+        file_count: Number of files in the report.
+        fp: Writable text stream.
+    """
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+    w = fp.write
+    w(f"# Consolidation: {name}\n\n**Generated:** {now}  \n**File count:** {file_count}  \n\n---\n")
 
-    Returns:
-        Markdown-formatted string.
+    # Files arrive grouped by corpus section
+    current_section = None
+    for f in files:
+        section_name = f.corpus_section or "(root)"
+        if section_name != current_section:
+            w(f"\n## {section_name}\n\n")
+            current_section = section_name
+        modified = f.modified_at.strftime("%Y-%m-%d") if f.modified_at else "unknown"
+        size = _format_size(f.file_size_bytes)
+        w(
+            f"- **{f.file_name}**\n"
+            f"  - Path: `{f.file_path}`\n"
+            f"  - Type: `{f.file_extension}` | Size: {size} | Modified: {modified}\n"
+        )
+
+
+def consolidate_json_stream(files: Iterable, name: str, file_count: int, fp: TextIO) -> None:
+    """Write a JSON consolidation report to a text stream.
+
+    The layout matches json.dump(..., indent=2), but file entries are
+    written one at a time instead of building the whole document first.
+
+    Args:
+        files: File instances or rows with every File column except content_text.
+        name: Name/label for the consolidation.
+        file_count: Number of files in the report.
+        fp: Writable text stream.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    header = {
+        "name": name,
+        "generated_at": now,
+        "file_count": file_count,
+    }
+    w = fp.write
+    w('{\n  "consolidation": ')
+    w(json.dumps(header, indent=2).replace("\n", "\n  "))
+    w(',\n  "files": [')
+    separator = "\n    "
+    for f in files:
+        w(separator)
+        w(json.dumps(file_to_dict(f), indent=2, default=str).replace("\n", "\n    "))
+        separator = ",\n    "
+    w("]\n}" if separator == "\n    " else "\n  ]\n}")
+
+
+def consolidate_text_stream(files: Iterable, name: str, file_count: int, fp: TextIO) -> None:
+    """Write a plain text file manifest to a text stream.
+
+    Args:
+        files: File instances or rows, ordered by path.
+        name: Name/label for the consolidation.
+        file_count: Number of files in the report.
+        fp: Writable text stream.
     """
     now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-    lines = [
-        f"# Consolidation: {name}",
-        "",
-        f"**Generated:** {now}  ",
-        f"**File count:** {len(files)}  ",
-        "",
-        "---",
-        "",
-    ]
+    w = fp.write
+    w(f"Consolidation: {name}\nGenerated: {now}\nFile count: {file_count}\n{'=' * 60}\n")
 
-    # Group files by corpus section
-    sections: dict[str, list[File]] = {}
     for f in files:
-        section = f.corpus_section or "(root)"
-        sections.setdefault(section, []).append(f)
+        modified = f.modified_at.strftime("%Y-%m-%d %H:%M") if f.modified_at else "unknown"
+        w(f"\n{f.file_path}  [{modified}]  ({_format_size(f.file_size_bytes)})")
 
-    for section_name in sorted(sections.keys()):
-        section_files = sections[section_name]
-        lines.append(f"## {section_name}")
-        lines.append("")
-        for f in sorted(section_files, key=lambda x: x.file_path):
-            modified = f.modified_at.strftime("%Y-%m-%d") if f.modified_at else "unknown"
-            size = _format_size(f.file_size_bytes)
-            lines.append(f"- **{f.file_name}**")
-            lines.append(f"  - Path: `{f.file_path}`")
-            lines.append(f"  - Type: `{f.file_extension}` | Size: {size} | Modified: {modified}")
-        lines.append("")
 
-    return "\n".join(lines)
+def consolidate_markdown(files: list[File], name: str) -> str:
+    """Generate a markdown consolidation report.
+
+    Args:
+        files: List of File model instances.
+        name: Name/label for the consolidation.
+
+    Returns:
+        Markdown-formatted string.
+    """
+    buf = io.StringIO()
+    consolidate_markdown_stream(sorted(files, key=_markdown_key), name, len(files), buf)
+    return buf.getvalue()
 
 
 def consolidate_json(files: list[File], name: str) -> str:
@@ -73,16 +141,9 @@ def consolidate_json(files: list[File], name: str) -> str:
     Returns:
         JSON-formatted string.
     """
-    now = datetime.now(timezone.utc).isoformat()
-    data = {
-        "consolidation": {
-            "name": name,
-            "generated_at": now,
-            "file_count": len(files),
-        },
-        "files": [f.to_dict() for f in files],
-    }
-    return json.dumps(data, indent=2, default=str)
+    buf = io.StringIO()
+    consolidate_json_stream(files, name, len(files), buf)
+    return buf.getvalue()
 
 
 def consolidate_text(files: list[File], name: str) -> str:
@@ -95,28 +156,75 @@ def consolidate_text(files: list[File], name: str) -> str:
     Returns:
         Plain text string with file paths and dates.
     """
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-    lines = [
-        f"Consolidation: {name}",
-        f"Generated: {now}",
-        f"File count: {len(files)}",
-        "=" * 60,
-        "",
-    ]
-
-    for f in sorted(files, key=lambda x: x.file_path):
-        modified = f.modified_at.strftime("%Y-%m-%d %H:%M") if f.modified_at else "unknown"
-        lines.append(f"{f.file_path}  [{modified}]  ({_format_size(f.file_size_bytes)})")
-
-    return "\n".join(lines)
+    buf = io.StringIO()
+    consolidate_text_stream(sorted(files, key=_text_key), name, len(files), buf)
+    return buf.getvalue()
 
 
 FORMAT_HANDLERS = {
-    "markdown": (consolidate_markdown, ".md"),
-    "json": (consolidate_json, ".json"),
-    "text": (consolidate_text, ".txt"),
+    "markdown": (consolidate_markdown_stream, ".md"),
+    "json": (consolidate_json_stream, ".json"),
+    "text": (consolidate_text_stream, ".txt"),
 }
 
+# Row order each format expects: SQL ORDER BY clauses and the matching
+# Python sort key, used to merge results from chunked IN queries.
+_FORMAT_ORDER = {
+    "markdown": ((func.coalesce(File.corpus_section, "(root)"), File.file_path), _markdown_key),
+    "json": ((File.id,), attrgetter("id")),
+    "text": ((File.file_path,), _text_key),
+}
+
+# Columns fetched for export; skips content_text
+_EXPORT_COLUMNS = (
+    File.id,
+    File.file_path,
+    File.file_name,
+    File.file_extension,
+    File.file_size_bytes,
+    File.parent_dir,
+    File.corpus_section,
+    File.created_at,
+    File.modified_at,
+    File.indexed_at,
+    File.file_hash,
+)
+
+# Anything but word characters (str.isalnum() or "_"), "-" and space
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w\- ]")
+
+# Write buffer for consolidation output files
+_OUTPUT_BUFFER_SIZE = 1 << 20
+
+
+def _count_files(db_session: Session, file_ids: list[int]) -> int:
+    """Count how many of the given IDs exist, in IN-list sized chunks."""
+    return sum(
+        db_session.execute(select(func.count(File.id)).where(File.id.in_(chunk))).scalar()
+        for chunk in chunked(file_ids)
+    )
+
+
+def _iter_file_rows(db_session: Session, file_ids: list[int], output_format: str) -> Iterator[Row]:
+    """Stream export rows for the given IDs in the order the format expects.
+
+    Each IN-list chunk is queried with yield_per, and the individually ordered
+    results are merged so the combined stream stays ordered.
+    """
+    order_by, key = _FORMAT_ORDER[output_format]
+    streams = [
+        db_session.execute(
+            select(*_EXPORT_COLUMNS)
+            .where(File.id.in_(chunk))
+            .order_by(*order_by)
+            .execution_options(yield_per=1000)
+        )
+        for chunk in chunked(file_ids)
+    ]
+    if len(streams) == 1:
+        return iter(streams[0])
+    return heapq.merge(*streams, key=key)
+
 
 def consolidate_files(
     file_ids: list[int],
@@ -125,6 +233,7 @@ def consolidate_files(
     db_session: Session,
     output_dir: str,
     query_params_json: str = "{}",
+    job_id: int | None = None,
 ) -> ConsolidationJob:
     """Run a consolidation job: query files, generate output, save to disk.
 
@@ -135,45 +244,55 @@ def consolidate_files(
         db_session: SQLAlchemy database session.
         output_dir: Directory where output files are written.
         query_params_json: JSON string of the search criteria used.
+        job_id: ID of an existing (pending) job to complete instead of
+            recording a new one.
 
     Returns:
-        The created ConsolidationJob instance.
+        The created or completed ConsolidationJob instance.
 
     Raises:
-        ValueError: If output_format is not supported.
+        ValueError: If output_format is not supported or job_id is unknown.
     """
     if output_format not in FORMAT_HANDLERS:
         raise ValueError(f"Unsupported format: {output_format}. Choose from: {list(FORMAT_HANDLERS.keys())}")
 
-    files = db_session.query(File).filter(File.id.in_(file_ids)).all()
+    job = None
+    if job_id is not None:
+        job = db_session.get(ConsolidationJob, job_id)
+        if job is None:
+            raise ValueError(f"Unknown consolidation job: {job_id}")
+
+    file_ids = list(dict.fromkeys(file_ids))
+    file_count = _count_files(db_session, file_ids)
 
     handler, extension = FORMAT_HANDLERS[output_format]
-    content = handler(files, name)
 
     # Ensure output directory exists
     out_dir = Path(output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
     # Generate filename with timestamp
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    safe_name = "".join(c if c.isalnum() or c in "-_ " else "_" for c in name).strip()
-    safe_name = safe_name.replace(" ", "_")
+    now = datetime.now(timezone.utc)
+    timestamp = now.strftime("%Y%m%d_%H%M%S")
+    safe_name = _UNSAFE_FILENAME_CHARS.sub("_", name).strip().replace(" ", "_")
     filename = f"{timestamp}_{safe_name}{extension}"
     output_path = out_dir / filename
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(content)
+    with open(output_path, "w", encoding="utf-8", buffering=_OUTPUT_BUFFER_SIZE) as fp:
+        handler(_iter_file_rows(db_session, file_ids, output_format), name, file_count, fp)
 
     # Record the job
-    job = ConsolidationJob(
-        name=name,
-        query_params=query_params_json,
-        output_path=str(output_path),
-        output_format=output_format,
-        created_at=datetime.now(timezone.utc),
-        file_count=len(files),
-    )
-    db_session.add(job)
+    if job is None:
+        job = ConsolidationJob(
+            name=name,
+            query_params=query_params_json,
+            output_format=output_format,
+            created_at=now,
+        )
+        db_session.add(job)
+    job.output_path = str(output_path)
+    job.file_count = file_count
+    job.status = "complete"
     db_session.commit()
 
     return job
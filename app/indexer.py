@@ -5,15 +5,24 @@ into the database. Supports both full and incremental indexing.
 """
 
 import fnmatch
+import functools
 import hashlib
 import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Generator
+from typing import Generator, Iterable
 
+from sqlalchemy import Row, delete, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
-from app.models import File
+from app.cache import bump_corpus_generation
+from app.models import File, file_tags
+from app.utils import chunked
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +30,12 @@ logger = logging.getLogger(__name__)
 DEFAULT_SKIP_PATTERNS = ["~$*", "*.tmp", "Thumbs.db", ".DS_Store"]
 DEFAULT_SUPPORTED_EXTENSIONS = [".md", ".docx", ".xlsx", ".pdf", ".vsdx", ".txt", ".csv"]
 
+# Number of written records per indexer transaction
+COMMIT_BATCH_SIZE = 2000
+
+# Read buffer used when hashlib.file_digest is unavailable
+_HASH_BUFFER_SIZE = 1 << 20
+
 
 def compute_file_hash(file_path: Path) -> str:
     """Compute SHA-256 hash of a file's contents.
@@ -31,50 +46,169 @@ def compute_file_hash(file_path: Path) -> str:
     Returns:
         Hex-encoded SHA-256 hash string.
     """
-    sha256 = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            sha256.update(chunk)
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        # Python < 3.11: read into one reusable buffer instead of
+        # allocating a new bytes object per chunk.
+        sha256 = hashlib.sha256()
+        buf = bytearray(_HASH_BUFFER_SIZE)
+        view = memoryview(buf)
+        while n := f.readinto(view):
+            sha256.update(view[:n])
     return sha256.hexdigest()
 
 
-def _should_skip(name: str, skip_patterns: list[str]) -> bool:
+def _safe_hash(meta: dict) -> str | None:
+    """Hash a walked file, logging and returning None if it cannot be read."""
+    try:
+        return compute_file_hash(Path(meta["absolute_path"]))
+    except (OSError, PermissionError) as e:
+        logger.warning("Could not hash file %s: %s", meta["file_path"], e)
+        return None
+
+
+def compile_skip_patterns(skip_patterns: Iterable[str]) -> re.Pattern:
+    """Combine glob skip patterns into a single compiled regex.
+
+    Matches fnmatch.fnmatch semantics, including case-insensitive matching
+    on platforms where os.path.normcase folds case.
+
+    Args:
+        skip_patterns: Glob patterns for files/dirs to skip.
+
+    Returns:
+        Compiled pattern accepted by walk_corpus in place of the list.
+    """
+    return _compile_skip_patterns(tuple(skip_patterns))
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_skip_patterns(skip_patterns: tuple[str, ...]) -> re.Pattern:
+    """Cached implementation of compile_skip_patterns."""
+    if not skip_patterns:
+        return re.compile(r"(?!)")
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in skip_patterns), flags)
+
+
+def _should_skip(name: str, skip_re: re.Pattern) -> bool:
     """Check if a file or directory name matches any skip pattern."""
-    for pattern in skip_patterns:
-        if fnmatch.fnmatch(name, pattern):
-            return True
-    return False
+    return skip_re.match(name) is not None
 
 
-def determine_corpus_section(relative_path: str) -> str | None:
+def _stat_matches(record: Row, meta: dict) -> bool:
+    """Check whether an indexed record has the same size and mtime as on disk.
+
+    SQLite returns naive datetimes, so the stored value is treated as UTC.
+    """
+    if record.file_size_bytes != meta["file_size_bytes"] or record.modified_at is None:
+        return False
+    modified_at = record.modified_at
+    if modified_at.tzinfo is None:
+        modified_at = modified_at.replace(tzinfo=timezone.utc)
+    return modified_at == meta["modified_at"]
+
+
+def determine_corpus_section(parts: tuple[str, ...]) -> str | None:
     """Map a file's relative path to a corpus section label.
 
     The section is derived from the top-level directory name within
     the corpus root.
 
     Args:
-        relative_path: File path relative to the corpus root.
+        parts: Components of the file path relative to the corpus root.
 
     Returns:
         Section label string, or None if the file is at the root level.
     """
-    parts = Path(relative_path).parts
     if len(parts) <= 1:
         return None
     return parts[0]
 
 
+def _scan_dir(
+    dir_path: str,
+    rel_parts: tuple[str, ...],
+    skip_re: re.Pattern,
+    extensions: frozenset[str],
+) -> Generator[dict, None, None]:
+    """Recursively scan one directory for walk_corpus.
+
+    Hidden and skipped directories are pruned rather than descended into.
+    Entries are visited in name order so the walk is deterministic.
+
+    Args:
+        dir_path: Absolute path of the directory to scan.
+        rel_parts: Components of dir_path relative to the corpus root
+            (empty for the root itself).
+        skip_re: Compiled skip patterns, from compile_skip_patterns.
+        extensions: Lower-cased file extensions to include.
+
+    Yields:
+        Dictionary with file metadata keys.
+    """
+    try:
+        with os.scandir(dir_path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError as e:
+        logger.warning("Could not scan directory %s: %s", dir_path, e)
+        return
+
+    # Shared by every file in this directory
+    parent_dir = "/".join(rel_parts)
+    rel_prefix = f"{parent_dir}/" if rel_parts else ""
+
+    for entry in entries:
+        name = entry.name
+
+        # Skip hidden files and directories, and noise files
+        if name.startswith(".") or _should_skip(name, skip_re):
+            continue
+
+        if entry.is_dir():
+            # Symlinked directories are not followed
+            if not entry.is_symlink():
+                yield from _scan_dir(entry.path, (*rel_parts, name), skip_re, extensions)
+            continue
+
+        # Filter by extension
+        ext = os.path.splitext(name)[1].lower()
+        if ext not in extensions or not entry.is_file():
+            continue
+
+        relative_path = rel_prefix + name
+        stat = entry.stat()
+
+        yield {
+            "file_path": relative_path,
+            "file_name": name,
+            "file_extension": ext,
+            "file_size_bytes": stat.st_size,
+            "parent_dir": parent_dir,
+            "corpus_section": determine_corpus_section((*rel_parts, name)),
+            "created_at": datetime.fromtimestamp(stat.st_ctime, tz=timezone.utc),
+            "modified_at": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            "absolute_path": entry.path,
+        }
+
+
 def walk_corpus(
     root_path: Path,
-    skip_patterns: list[str] | None = None,
-    supported_extensions: list[str] | None = None,
+    skip_patterns: list[str] | re.Pattern | None = None,
+    supported_extensions: Iterable[str] | None = None,
 ) -> Generator[dict, None, None]:
     """Walk the corpus directory and yield metadata dicts for each eligible file.
 
+    Paths in the yielded dicts are relative to the root and "/"-separated.
+
     Args:
         root_path: Absolute path to the corpus root directory.
-        skip_patterns: Glob patterns for files/dirs to skip.
+        skip_patterns: Glob patterns for files/dirs to skip, or a pattern
+            already compiled with compile_skip_patterns.
         supported_extensions: File extensions to include (with leading dot).
+            A frozenset is used as-is and must already be lower-cased.
 
     Yields:
         Dictionary with file metadata keys.
@@ -89,46 +223,192 @@ def walk_corpus(
         logger.error("Corpus root does not exist or is not a directory: %s", root)
         return
 
-    for item in sorted(root.rglob("*")):
-        # Skip directories themselves (we only index files)
-        if item.is_dir():
-            continue
+    if isinstance(skip_patterns, re.Pattern):
+        skip_re = skip_patterns
+    else:
+        skip_re = compile_skip_patterns(skip_patterns)
+    if isinstance(supported_extensions, frozenset):
+        extensions = supported_extensions
+    else:
+        extensions = frozenset(e.lower() for e in supported_extensions)
+    yield from _scan_dir(str(root), (), skip_re, extensions)
 
-        # Skip hidden files and directories
-        parts = item.relative_to(root).parts
-        if any(part.startswith(".") for part in parts):
-            continue
 
-        # Skip noise files
-        if _should_skip(item.name, skip_patterns):
-            continue
+def _load_existing(db_session: Session) -> dict[str, Row]:
+    """Fetch the columns needed for change detection for every indexed file.
 
-        # Filter by extension
-        ext = item.suffix.lower()
-        if ext not in supported_extensions:
+    Returns:
+        Mapping of relative file path to a lightweight result row.
+    """
+    rows = db_session.execute(
+        select(
+            File.id,
+            File.file_path,
+            File.file_hash,
+            File.modified_at,
+            File.file_size_bytes,
+        )
+    ).all()
+    return {row.file_path: row for row in rows}
+
+
+def _record_values(meta: dict, file_hash: str, indexed_at: datetime) -> dict:
+    """Build the column values written for a new or changed file."""
+    return {
+        "file_name": meta["file_name"],
+        "file_extension": meta["file_extension"],
+        "file_size_bytes": meta["file_size_bytes"],
+        "parent_dir": meta["parent_dir"],
+        "corpus_section": meta["corpus_section"],
+        "created_at": meta["created_at"],
+        "modified_at": meta["modified_at"],
+        "indexed_at": indexed_at,
+        "file_hash": file_hash,
+    }
+
+
+# Columns rewritten when an upsert hits an existing file_path
+_UPSERT_COLUMNS = (
+    "file_name",
+    "file_extension",
+    "file_size_bytes",
+    "parent_dir",
+    "corpus_section",
+    "created_at",
+    "modified_at",
+    "indexed_at",
+    "file_hash",
+)
+
+
+def _write_batch(db_session: Session, upserts: list[dict], touched: list[dict]) -> None:
+    """Write pending rows with bulk statements, commit, and clear the lists.
+
+    New and changed files go through a single INSERT ... ON CONFLICT
+    (file_path) DO UPDATE executemany, which only rewrites a row whose
+    hash actually differs.
+    """
+    if upserts:
+        stmt = sqlite_insert(File)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[File.file_path],
+            set_={column: stmt.excluded[column] for column in _UPSERT_COLUMNS},
+            where=File.file_hash.is_distinct_from(stmt.excluded.file_hash),
+        )
+        db_session.execute(stmt, upserts)
+    # Mtime-only changes: bulk UPDATE by primary key
+    if touched:
+        db_session.execute(update(File), touched)
+    if upserts or touched:
+        db_session.commit()
+    upserts.clear()
+    touched.clear()
+
+
+def _hash_and_write(
+    db_session: Session,
+    pending: list[dict],
+    existing_map: dict[str, Row],
+    stats: dict[str, int],
+    run_ts: datetime,
+    executor: ThreadPoolExecutor | None,
+) -> None:
+    """Hash one slice of new or possibly changed files, write it, and commit.
+
+    Clears pending afterwards.
+    """
+    # Hashing releases the GIL, so threads overlap disk reads and digest work.
+    # Database writes stay on this thread.
+    if executor is not None and len(pending) > 1:
+        hashes = list(executor.map(_safe_hash, pending))
+    else:
+        hashes = [_safe_hash(meta) for meta in pending]
+
+    upserts: list[dict] = []
+    touched: list[dict] = []
+    for meta, file_hash in zip(pending, hashes):
+        if file_hash is None:
             continue
 
-        relative_path = str(item.relative_to(root))
-        stat = item.stat()
+        rel_path = meta["file_path"]
+        existing = existing_map.get(rel_path)
 
-        yield {
-            "file_path": relative_path,
-            "file_name": item.name,
-            "file_extension": ext,
-            "file_size_bytes": stat.st_size,
-            "parent_dir": str(item.parent.relative_to(root)) if item.parent != root else "",
-            "corpus_section": determine_corpus_section(relative_path),
-            "created_at": datetime.fromtimestamp(stat.st_ctime, tz=timezone.utc),
-            "modified_at": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
-            "absolute_path": str(item),
-        }
+        if existing:
+            if existing.file_hash == file_hash:
+                # Content is identical; record the new mtime so the next
+                # run can take the stat fast path again.
+                touched.append({"id": existing.id, "modified_at": meta["modified_at"]})
+                stats["unchanged"] += 1
+                continue
+
+            stats["updated"] += 1
+        else:
+            stats["new"] += 1
+        upserts.append({"file_path": rel_path, **_record_values(meta, file_hash, run_ts)})
+
+    _write_batch(db_session, upserts, touched)
+    pending.clear()
+
+
+def _sync_files(
+    root: Path,
+    db_session: Session,
+    existing_map: dict[str, Row],
+    stats: dict[str, int],
+    skip_patterns: list[str] | re.Pattern | None,
+    supported_extensions: Iterable[str] | None,
+    parallel_hash: bool,
+) -> set[str]:
+    """Walk the corpus and write new and changed files to the database.
+
+    Shared by index_corpus and reindex_changed. Files needing a hash are
+    collected in slices of COMMIT_BATCH_SIZE; each slice is hashed, written
+    and committed before the walk continues, so memory stays bounded and an
+    interrupted run keeps the slices already committed.
+
+    Args:
+        root: Corpus root directory.
+        db_session: SQLAlchemy database session.
+        existing_map: Indexed files keyed by path, from _load_existing.
+        stats: Stats dict updated in place (new, updated, unchanged, total).
+        skip_patterns: Glob patterns for files/dirs to skip, or a compiled pattern.
+        supported_extensions: File extensions to include.
+        parallel_hash: Hash changed files on a thread pool.
+
+    Returns:
+        Set of relative paths seen on disk.
+    """
+    run_ts = datetime.now(timezone.utc)
+    seen_paths: set[str] = set()
+    pending: list[dict] = []
+
+    with ThreadPoolExecutor() if parallel_hash else nullcontext() as executor:
+        for meta in walk_corpus(root, skip_patterns, supported_extensions):
+            stats["total"] += 1
+            rel_path = meta["file_path"]
+            seen_paths.add(rel_path)
+
+            existing = existing_map.get(rel_path)
+            if existing and _stat_matches(existing, meta):
+                stats["unchanged"] += 1
+                continue
+
+            pending.append(meta)
+            if len(pending) >= COMMIT_BATCH_SIZE:
+                _hash_and_write(db_session, pending, existing_map, stats, run_ts, executor)
+
+        if pending:
+            _hash_and_write(db_session, pending, existing_map, stats, run_ts, executor)
+
+    return seen_paths
 
 
 def index_corpus(
     root_path: str,
     db_session: Session,
-    skip_patterns: list[str] | None = None,
-    supported_extensions: list[str] | None = None,
+    skip_patterns: list[str] | re.Pattern | None = None,
+    supported_extensions: Iterable[str] | None = None,
+    parallel_hash: bool = True,
 ) -> dict[str, int]:
     """Run a full index of the corpus directory.
 
@@ -138,89 +418,52 @@ def index_corpus(
     Args:
         root_path: Path to the corpus root directory.
         db_session: SQLAlchemy database session.
-        skip_patterns: Glob patterns for files/dirs to skip.
+        skip_patterns: Glob patterns for files/dirs to skip, or a compiled pattern.
         supported_extensions: File extensions to include.
+        parallel_hash: Hash changed files on a thread pool.
 
     Returns:
         Stats dict with keys: new, updated, unchanged, deleted, total.
     """
     root = Path(root_path)
     stats = {"new": 0, "updated": 0, "unchanged": 0, "deleted": 0, "total": 0}
-    seen_paths: set[str] = set()
-
-    for meta in walk_corpus(root, skip_patterns, supported_extensions):
-        stats["total"] += 1
-        rel_path = meta["file_path"]
-        seen_paths.add(rel_path)
-
-        try:
-            file_hash = compute_file_hash(Path(meta["absolute_path"]))
-        except (OSError, PermissionError) as e:
-            logger.warning("Could not hash file %s: %s", rel_path, e)
-            continue
 
-        existing = db_session.query(File).filter_by(file_path=rel_path).first()
-
-        if existing:
-            if existing.file_hash == file_hash:
-                stats["unchanged"] += 1
-                continue
-
-            # Update existing record
-            existing.file_name = meta["file_name"]
-            existing.file_extension = meta["file_extension"]
-            existing.file_size_bytes = meta["file_size_bytes"]
-            existing.parent_dir = meta["parent_dir"]
-            existing.corpus_section = meta["corpus_section"]
-            existing.created_at = meta["created_at"]
-            existing.modified_at = meta["modified_at"]
-            existing.indexed_at = datetime.now(timezone.utc)
-            existing.file_hash = file_hash
-            stats["updated"] += 1
-        else:
-            # Create new record
-            new_file = File(
-                file_path=rel_path,
-                file_name=meta["file_name"],
-                file_extension=meta["file_extension"],
-                file_size_bytes=meta["file_size_bytes"],
-                parent_dir=meta["parent_dir"],
-                corpus_section=meta["corpus_section"],
-                created_at=meta["created_at"],
-                modified_at=meta["modified_at"],
-                indexed_at=datetime.now(timezone.utc),
-                file_hash=file_hash,
-            )
-            db_session.add(new_file)
-            stats["new"] += 1
+    existing_map = _load_existing(db_session)
+    seen_paths = _sync_files(
+        root, db_session, existing_map, stats, skip_patterns, supported_extensions, parallel_hash
+    )
 
     # Remove records for files that no longer exist
-    all_indexed = db_session.query(File).all()
-    for record in all_indexed:
-        if record.file_path not in seen_paths:
-            db_session.delete(record)
-            stats["deleted"] += 1
+    to_delete = [existing_map[path].id for path in existing_map.keys() - seen_paths]
+    for chunk in chunked(to_delete):
+        db_session.execute(delete(file_tags).where(file_tags.c.file_id.in_(chunk)))
+        db_session.execute(delete(File).where(File.id.in_(chunk)))
+    stats["deleted"] = len(to_delete)
 
     db_session.commit()
+    bump_corpus_generation()
     return stats
 
 
 def reindex_changed(
     root_path: str,
     db_session: Session,
-    skip_patterns: list[str] | None = None,
-    supported_extensions: list[str] | None = None,
+    skip_patterns: list[str] | re.Pattern | None = None,
+    supported_extensions: Iterable[str] | None = None,
+    parallel_hash: bool = True,
 ) -> dict[str, int]:
     """Incremental reindex: only process new or changed files.
 
-    Compares file hashes to detect changes. Does not remove deleted files
-    (use full index_corpus for that).
+    Files whose size and modification time match the index are skipped
+    without hashing; otherwise file hashes are compared to detect changes.
+    Does not remove deleted files (use full index_corpus for that).
 
     Args:
         root_path: Path to the corpus root directory.
         db_session: SQLAlchemy database session.
-        skip_patterns: Glob patterns for files/dirs to skip.
+        skip_patterns: Glob patterns for files/dirs to skip, or a compiled pattern.
         supported_extensions: File extensions to include.
+        parallel_hash: Hash changed files on a thread pool.
 
     Returns:
         Stats dict with keys: new, updated, unchanged, total.
@@ -228,48 +471,11 @@ def reindex_changed(
     root = Path(root_path)
     stats = {"new": 0, "updated": 0, "unchanged": 0, "total": 0}
 
-    for meta in walk_corpus(root, skip_patterns, supported_extensions):
-        stats["total"] += 1
-        rel_path = meta["file_path"]
-
-        try:
-            file_hash = compute_file_hash(Path(meta["absolute_path"]))
-        except (OSError, PermissionError) as e:
-            logger.warning("Could not hash file %s: %s", rel_path, e)
-            continue
-
-        existing = db_session.query(File).filter_by(file_path=rel_path).first()
-
-        if existing:
-            if existing.file_hash == file_hash:
-                stats["unchanged"] += 1
-                continue
-
-            existing.file_name = meta["file_name"]
-            existing.file_extension = meta["file_extension"]
-            existing.file_size_bytes = meta["file_size_bytes"]
-            existing.parent_dir = meta["parent_dir"]
-            existing.corpus_section = meta["corpus_section"]
-            existing.created_at = meta["created_at"]
-            existing.modified_at = meta["modified_at"]
-            existing.indexed_at = datetime.now(timezone.utc)
-            existing.file_hash = file_hash
-            stats["updated"] += 1
-        else:
-            new_file = File(
-                file_path=rel_path,
-                file_name=meta["file_name"],
-                file_extension=meta["file_extension"],
-                file_size_bytes=meta["file_size_bytes"],
-                parent_dir=meta["parent_dir"],
-                corpus_section=meta["corpus_section"],
-                created_at=meta["created_at"],
-                modified_at=meta["modified_at"],
-                indexed_at=datetime.now(timezone.utc),
-                file_hash=file_hash,
-            )
-            db_session.add(new_file)
-            stats["new"] += 1
+    existing_map = _load_existing(db_session)
+    _sync_files(
+        root, db_session, existing_map, stats, skip_patterns, supported_extensions, parallel_hash
+    )
 
     db_session.commit()
+    bump_corpus_generation()
     return stats
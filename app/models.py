@@ -2,7 +2,8 @@
 
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Table, Text
+from sqlalchemy import Column, Connection, DateTime, ForeignKey, Index, Integer, String, Table, Text
+from sqlalchemy import column, inspect, table, text
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
@@ -21,6 +22,20 @@ class File(db.Model):  # type: ignore[name-defined]
     """Represents an indexed file in the knowledge corpus."""
 
     __tablename__ = "files"
+    __table_args__ = (
+        # Directory listings filter on parent_dir and sort by file_name
+        Index("ix_files_parent_dir_file_name", "parent_dir", "file_name"),
+        # Search sort orders, with id as the keyset pagination tiebreaker
+        Index("ix_files_file_name_id", "file_name", "id"),
+        # Case-insensitive prefix search: SQLite's LIKE 'abc%' can seek this
+        Index("ix_files_file_name_nocase", text("file_name COLLATE NOCASE")),
+        Index("ix_files_file_size_bytes_id", "file_size_bytes", "id"),
+        Index("ix_files_file_extension_id", "file_extension", "id"),
+        Index("ix_files_corpus_section_id", "corpus_section", "id"),
+        # Extension/section facets combined with a modified_at range or sort
+        Index("ix_files_file_extension_modified_at", "file_extension", "modified_at"),
+        Index("ix_files_corpus_section_modified_at", "corpus_section", "modified_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     file_path = Column(Text, nullable=False, unique=True, index=True)
@@ -28,7 +43,7 @@ class File(db.Model):  # type: ignore[name-defined]
     file_extension = Column(Text, nullable=False)
     file_size_bytes = Column(Integer, nullable=False)
     parent_dir = Column(Text, nullable=False)
-    corpus_section = Column(Text, index=True)
+    corpus_section = Column(Text)
     created_at = Column(DateTime)
     modified_at = Column(DateTime, index=True)
     indexed_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
@@ -42,19 +57,61 @@ class File(db.Model):  # type: ignore[name-defined]
 
     def to_dict(self) -> dict:
         """Convert file record to a dictionary."""
-        return {
-            "id": self.id,
-            "file_path": self.file_path,
-            "file_name": self.file_name,
-            "file_extension": self.file_extension,
-            "file_size_bytes": self.file_size_bytes,
-            "parent_dir": self.parent_dir,
-            "corpus_section": self.corpus_section,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "modified_at": self.modified_at.isoformat() if self.modified_at else None,
-            "indexed_at": self.indexed_at.isoformat() if self.indexed_at else None,
-            "file_hash": self.file_hash,
-        }
+        return file_to_dict(self)
+
+
+def file_to_dict(record) -> dict:
+    """Convert a File instance, or a result row with the same columns, to a dictionary."""
+    return {
+        "id": record.id,
+        "file_path": record.file_path,
+        "file_name": record.file_name,
+        "file_extension": record.file_extension,
+        "file_size_bytes": record.file_size_bytes,
+        "parent_dir": record.parent_dir,
+        "corpus_section": record.corpus_section,
+        "created_at": record.created_at.isoformat() if record.created_at else None,
+        "modified_at": record.modified_at.isoformat() if record.modified_at else None,
+        "indexed_at": record.indexed_at.isoformat() if record.indexed_at else None,
+        "file_hash": record.file_hash,
+    }
+
+
+# Trigram full-text index over file names and paths (SQLite FTS5), so
+# substring filters can avoid a full table scan. It is an external-content
+# table kept in sync with files by triggers; setup_db.py creates it.
+file_fts = table("file_fts", column("rowid"), column("file_name"), column("file_path"))
+
+FILE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS file_fts USING fts5("
+    "file_name, file_path, content='files', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS files_fts_insert AFTER INSERT ON files BEGIN "
+    "INSERT INTO file_fts(rowid, file_name, file_path) "
+    "VALUES (new.id, new.file_name, new.file_path); END",
+    "CREATE TRIGGER IF NOT EXISTS files_fts_delete AFTER DELETE ON files BEGIN "
+    "INSERT INTO file_fts(file_fts, rowid, file_name, file_path) "
+    "VALUES ('delete', old.id, old.file_name, old.file_path); END",
+    "CREATE TRIGGER IF NOT EXISTS files_fts_update AFTER UPDATE OF file_name, file_path ON files BEGIN "
+    "INSERT INTO file_fts(file_fts, rowid, file_name, file_path) "
+    "VALUES ('delete', old.id, old.file_name, old.file_path); "
+    "INSERT INTO file_fts(rowid, file_name, file_path) "
+    "VALUES (new.id, new.file_name, new.file_path); END",
+)
+
+
+def create_file_fts(connection: Connection) -> None:
+    """Create the file_fts table and its triggers, and (re)build its contents.
+
+    Requires SQLite 3.34+ built with FTS5; raises OperationalError otherwise.
+    """
+    for statement in FILE_FTS_DDL:
+        connection.exec_driver_sql(statement)
+    connection.exec_driver_sql("INSERT INTO file_fts(file_fts) VALUES ('rebuild')")
+
+
+def has_file_fts(connection: Connection) -> bool:
+    """Return whether the database has the file_fts table."""
+    return inspect(connection).has_table("file_fts")
 
 
 class Tag(db.Model):  # type: ignore[name-defined]
@@ -75,6 +132,10 @@ class ConsolidationJob(db.Model):  # type: ignore[name-defined]
     """Tracks consolidation/export jobs."""
 
     __tablename__ = "consolidation_jobs"
+    __table_args__ = (
+        # History listing, newest first, with id as the keyset tiebreaker
+        Index("ix_consolidation_jobs_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(Text, nullable=False)
@@ -83,6 +144,8 @@ class ConsolidationJob(db.Model):  # type: ignore[name-defined]
     output_format = Column(Text, nullable=False)
     created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     file_count = Column(Integer)
+    # "pending" while a background export runs, then "complete" or "failed"
+    status = Column(Text, nullable=False, default="complete", server_default="complete")
 
     def __repr__(self) -> str:
         return f"<ConsolidationJob {self.name}>"
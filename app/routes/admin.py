@@ -37,8 +37,11 @@ def reindex():
         return redirect(url_for("admin.admin_page"))
 
     indexer_config = current_app.config["KCM"].get("indexer", {})
-    skip_patterns = indexer_config.get("skip_patterns")
+    skip_patterns = indexer_config.get(
+        "skip_patterns_compiled", indexer_config.get("skip_patterns")
+    )
     supported_extensions = indexer_config.get("supported_extensions")
+    parallel_hash = indexer_config.get("parallel_hash", True)
 
     try:
         stats = index_corpus(
@@ -46,6 +49,7 @@ def reindex():
             db_session=db.session,
             skip_patterns=skip_patterns,
             supported_extensions=supported_extensions,
+            parallel_hash=parallel_hash,
         )
         flash(
             f"Full reindex complete. "
@@ -70,8 +74,11 @@ def reindex_incremental():
         return redirect(url_for("admin.admin_page"))
 
     indexer_config = current_app.config["KCM"].get("indexer", {})
-    skip_patterns = indexer_config.get("skip_patterns")
+    skip_patterns = indexer_config.get(
+        "skip_patterns_compiled", indexer_config.get("skip_patterns")
+    )
     supported_extensions = indexer_config.get("supported_extensions")
+    parallel_hash = indexer_config.get("parallel_hash", True)
 
     try:
         stats = reindex_changed(
@@ -79,6 +86,7 @@ def reindex_incremental():
             db_session=db.session,
             skip_patterns=skip_patterns,
             supported_extensions=supported_extensions,
+            parallel_hash=parallel_hash,
         )
         flash(
             f"Incremental reindex complete. "
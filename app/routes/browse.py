@@ -3,9 +3,11 @@
 from pathlib import PurePosixPath
 
 from flask import Blueprint, render_template, current_app, abort
-from sqlalchemy import func
+from sqlalchemy import Text, and_, func
+from sqlalchemy.orm import joinedload
 
 from app.models import File, db
+from app.utils import SQLITE_INT_MAX
 
 browse_bp = Blueprint("browse", __name__, url_prefix="/browse")
 
@@ -19,61 +21,36 @@ def _get_tree_entries(parent_dir: str) -> dict:
     Returns:
         Dict with 'directories' (list of dicts) and 'files' (list of File objects).
     """
-    # Find all distinct subdirectories at this level
-    if parent_dir:
-        prefix = parent_dir + "/"
-        # Get files directly in this directory
-        files = (
-            File.query.filter(File.parent_dir == parent_dir)
-            .order_by(File.file_name)
-            .all()
-        )
-        # Get unique child directory names
-        child_dirs_query = (
-            db.session.query(File.parent_dir)
-            .filter(File.parent_dir.like(f"{prefix}%"))
-            .distinct()
-            .all()
-        )
-    else:
-        # Root level
-        files = (
-            File.query.filter(File.parent_dir == "")
-            .order_by(File.file_name)
-            .all()
-        )
-        child_dirs_query = (
-            db.session.query(File.parent_dir)
-            .filter(File.parent_dir != "")
-            .distinct()
-            .all()
-        )
-
-    # Extract immediate child directory names
-    child_dir_names: set[str] = set()
-    for (dir_path,) in child_dirs_query:
-        if parent_dir:
-            # Remove the prefix and get the first component
-            relative = dir_path[len(parent_dir) + 1:]
-        else:
-            relative = dir_path
-
-        if relative:
-            first_component = relative.split("/")[0]
-            child_dir_names.add(first_component)
+    # Files directly in this directory
+    files = (
+        File.query.filter(File.parent_dir == parent_dir)
+        .order_by(File.file_name)
+        .all()
+    )
+
+    # Immediate child directory names and their subtree file counts, computed
+    # in SQL: strip the prefix and keep everything up to the next "/".
+    prefix = parent_dir + "/" if parent_dir else ""
+    relative = func.substr(File.parent_dir, len(prefix) + 1, type_=Text)
+    first_component = func.substr(relative, 1, func.instr(relative.concat("/"), "/") - 1)
+    # Range predicates so the parent_dir index bounds the scan: everything
+    # starting with "a/b/" sorts in ["a/b/", "a/b0"), as "0" follows "/".
+    dir_filter = (
+        and_(File.parent_dir >= prefix, File.parent_dir < prefix[:-1] + "0")
+        if prefix
+        else File.parent_dir > ""
+    )
+    child_counts = dict(
+        db.session.query(first_component, func.count(File.id))
+        .filter(dir_filter, relative != "")
+        .group_by(first_component)
+        .all()
+    )
 
     directories = []
-    for name in sorted(child_dir_names):
-        full_path = f"{parent_dir}/{name}" if parent_dir else name
-        # Count files under this directory
-        count = (
-            db.session.query(func.count(File.id))
-            .filter(
-                (File.parent_dir == full_path) | (File.parent_dir.like(f"{full_path}/%"))
-            )
-            .scalar()
-        )
-        directories.append({"name": name, "path": full_path, "file_count": count})
+    for name in sorted(child_counts):
+        full_path = f"{prefix}{name}"
+        directories.append({"name": name, "path": full_path, "file_count": child_counts[name]})
 
     return {"directories": directories, "files": files}
 
@@ -123,10 +100,13 @@ def browse_partial(dir_path: str):
     return render_template("_browse_entries.html", entries=entries, current_path=dir_path)
 
 
-@browse_bp.route("/file/<int:file_id>")
+@browse_bp.route(f"/file/<int(max={SQLITE_INT_MAX}):file_id>")
 def file_detail(file_id: int):
     """Show metadata detail for a single file."""
-    file = File.query.get_or_404(file_id)
+    # Tags are rendered on the page, so load them in the same query
+    file = db.session.get(File, file_id, options=[joinedload(File.tags)])
+    if file is None:
+        abort(404)
 
     # Build breadcrumbs from file path
     parts = PurePosixPath(file.parent_dir).parts if file.parent_dir else ()
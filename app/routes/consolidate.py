@@ -1,6 +1,8 @@
 """Consolidation/export routes."""
 
 import json
+import os
+from datetime import datetime
 
 from flask import (
     Blueprint,
@@ -13,23 +15,30 @@ from flask import (
     current_app,
 )
 
+from sqlalchemy import select, tuple_
+
 from app.models import ConsolidationJob, File, db
 from app.consolidator import consolidate_files
+from app.tasks import submit_consolidation
+from app.utils import SQLITE_INT_MAX, chunked, to_int
 
 consolidate_bp = Blueprint("consolidate", __name__, url_prefix="/consolidate")
 
+# Jobs per page in the export history
+HISTORY_PAGE_SIZE = 50
+
+
+def _parse_file_ids(values: list[str]) -> list[int]:
+    """Parse submitted file ids, dropping malformed or out-of-range ones."""
+    file_ids = (to_int(value.strip()) for value in values)
+    return [fid for fid in file_ids if fid is not None]
+
 
 @consolidate_bp.route("/", methods=["GET", "POST"])
 def consolidate():
     """Handle consolidation form and execution."""
     if request.method == "POST":
-        file_ids_raw = request.form.getlist("file_ids")
-        file_ids = []
-        for fid in file_ids_raw:
-            try:
-                file_ids.append(int(fid))
-            except ValueError:
-                continue
+        file_ids = _parse_file_ids(request.form.getlist("file_ids"))
 
         if not file_ids:
             flash("No files selected for consolidation.", "warning")
@@ -43,35 +52,46 @@ def consolidate():
             "source": "manual_selection",
         }
 
-        output_dir = current_app.config["KCM"]["consolidation"]["output_dir"]
+        consolidation_config = current_app.config["KCM"]["consolidation"]
+        output_dir = consolidation_config["output_dir"]
 
         try:
-            job = consolidate_files(
-                file_ids=file_ids,
-                output_format=output_format,
-                name=name,
-                db_session=db.session,
-                output_dir=output_dir,
-                query_params_json=json.dumps(query_params),
-            )
-            flash(f"Consolidation complete: {job.file_count} files exported.", "success")
+            if consolidation_config.get("background", True):
+                submit_consolidation(
+                    app=current_app._get_current_object(),
+                    file_ids=file_ids,
+                    output_format=output_format,
+                    name=name,
+                    output_dir=output_dir,
+                    query_params_json=json.dumps(query_params),
+                )
+                flash(f"Consolidation started: {len(file_ids)} files queued.", "info")
+            else:
+                job = consolidate_files(
+                    file_ids=file_ids,
+                    output_format=output_format,
+                    name=name,
+                    db_session=db.session,
+                    output_dir=output_dir,
+                    query_params_json=json.dumps(query_params),
+                )
+                flash(f"Consolidation complete: {job.file_count} files exported.", "success")
             return redirect(url_for("consolidate.history"))
         except ValueError as e:
             flash(str(e), "danger")
             return redirect(url_for("consolidate.consolidate"))
 
     # GET: show consolidation form with selected files if any
-    file_ids_raw = request.args.getlist("file_ids")
-    file_ids = []
-    for fid in file_ids_raw:
-        try:
-            file_ids.append(int(fid))
-        except ValueError:
-            continue
+    file_ids = _parse_file_ids(request.args.getlist("file_ids"))
 
     selected_files = []
     if file_ids:
-        selected_files = File.query.filter(File.id.in_(file_ids)).all()
+        # Only the columns the form renders, in IN-list sized chunks
+        query = select(
+            File.id, File.file_name, File.file_path, File.file_extension, File.corpus_section
+        ).order_by(File.id)
+        for chunk in chunked(sorted(set(file_ids))):
+            selected_files.extend(db.session.execute(query.where(File.id.in_(chunk))).all())
 
     return render_template(
         "consolidate.html",
@@ -81,12 +101,42 @@ def consolidate():
 
 @consolidate_bp.route("/history")
 def history():
-    """List past consolidation jobs."""
-    jobs = ConsolidationJob.query.order_by(ConsolidationJob.created_at.desc()).all()
-    return render_template("consolidate_history.html", jobs=jobs)
+    """List past consolidation jobs, newest first, a page at a time.
 
+    Older pages are addressed by the created_at/id of the last job shown
+    (before / before_id query args) instead of an offset.
+    """
+    query = ConsolidationJob.query.order_by(
+        ConsolidationJob.created_at.desc(), ConsolidationJob.id.desc()
+    )
 
-@consolidate_bp.route("/download/<int:job_id>")
+    before = request.args.get("before", "").strip()
+    before_id = to_int(request.args.get("before_id", "").strip())
+    if before and before_id is not None:
+        try:
+            before_ts = datetime.fromisoformat(before)
+        except ValueError:
+            before_ts = None
+        if before_ts is not None:
+            query = query.filter(
+                tuple_(ConsolidationJob.created_at, ConsolidationJob.id) < tuple_(before_ts, before_id)
+            )
+
+    jobs = query.limit(HISTORY_PAGE_SIZE + 1).all()
+    next_page = None
+    if len(jobs) > HISTORY_PAGE_SIZE:
+        jobs = jobs[:HISTORY_PAGE_SIZE]
+        next_page = {"before": jobs[-1].created_at.isoformat(), "before_id": jobs[-1].id}
+
+    return render_template(
+        "consolidate_history.html",
+        jobs=jobs,
+        next_page=next_page,
+        is_first_page=not before,
+    )
+
+
+@consolidate_bp.route(f"/download/<int(max={SQLITE_INT_MAX}):job_id>")
 def download(job_id: int):
     """Download the output file of a consolidation job."""
     job = ConsolidationJob.query.get_or_404(job_id)
@@ -94,7 +144,16 @@ def download(job_id: int):
         flash("No output file available for this job.", "warning")
         return redirect(url_for("consolidate.history"))
 
+    if not os.path.isfile(job.output_path):
+        flash("The output file for this job no longer exists.", "warning")
+        return redirect(url_for("consolidate.history"))
+
+    # Conditional responses let browsers revalidate and resume downloads;
+    # the file itself is streamed via wsgi.file_wrapper (or X-Sendfile).
     return send_file(
         job.output_path,
         as_attachment=True,
+        conditional=True,
+        etag=True,
+        max_age=0,
     )
@@ -1,9 +1,8 @@
 """Search interface and results routes."""
 
 from flask import Blueprint, render_template, request
-from sqlalchemy import func
 
-from app.models import File, db
+from app.cache import get_extensions, get_sections
 from app.search import parse_search_params, execute_search
 
 search_bp = Blueprint("search", __name__, url_prefix="/search")
@@ -12,25 +11,10 @@ search_bp = Blueprint("search", __name__, url_prefix="/search")
 @search_bp.route("/")
 def search_page():
     """Render the search form with filter options."""
-    # Get available extensions and sections for filter dropdowns
-    extensions = (
-        db.session.query(File.file_extension)
-        .distinct()
-        .order_by(File.file_extension)
-        .all()
-    )
-    sections = (
-        db.session.query(File.corpus_section)
-        .filter(File.corpus_section.isnot(None))
-        .distinct()
-        .order_by(File.corpus_section)
-        .all()
-    )
-
     return render_template(
         "search.html",
-        extensions=[e[0] for e in extensions],
-        sections=[s[0] for s in sections],
+        extensions=get_extensions(),
+        sections=get_sections(),
     )
 
 
@@ -38,37 +22,28 @@ def search_page():
 def search_results():
     """Execute search and return results (htmx partial or full page)."""
     params = parse_search_params(request.args)
-    results = execute_search(params)
-
-    # Get available extensions and sections for the form
-    extensions = (
-        db.session.query(File.file_extension)
-        .distinct()
-        .order_by(File.file_extension)
-        .all()
-    )
-    sections = (
-        db.session.query(File.corpus_section)
-        .filter(File.corpus_section.isnot(None))
-        .distinct()
-        .order_by(File.corpus_section)
-        .all()
-    )
 
     # Check if this is an htmx request
     is_htmx = request.headers.get("HX-Request") == "true"
 
+    # htmx partials page with "Load more" instead of page numbers, so they
+    # skip the COUNT query
+    params.need_total = not is_htmx
+    results = execute_search(params)
+
     if is_htmx:
+        # "Load more" requests only need the next rows appended to the table
+        template = "_search_rows.html" if request.args.get("fragment") == "rows" else "_search_results.html"
         return render_template(
-            "_search_results.html",
+            template,
             results=results,
             params=params,
         )
 
     return render_template(
         "search.html",
-        extensions=[e[0] for e in extensions],
-        sections=[s[0] for s in sections],
+        extensions=get_extensions(),
+        sections=get_sections(),
         results=results,
         params=params,
     )
@@ -4,13 +4,27 @@ Constructs SQLAlchemy queries from search parameters with support
 for filtering, pagination, and sorting.
 """
 
+import base64
+import binascii
+import functools
+import json
+import re
 from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Iterator
 
-from sqlalchemy import asc, desc
+from sqlalchemy import Column, and_, asc, desc, select, tuple_
 from sqlalchemy.orm import Query
 
-from app.models import File
+from app.cache import cache_key
+from app.models import File, db, file_fts, has_file_fts
+from app.utils import SQLITE_INT_MAX, SQLITE_INT_MIN, to_int
+
+# The trigram tokenizer cannot match terms shorter than this
+FTS_MIN_TERM_LENGTH = 3
+
+MAX_PER_PAGE = 100
+MAX_PAGE = SQLITE_INT_MAX // MAX_PER_PAGE
 
 
 @dataclass
@@ -29,6 +43,11 @@ class SearchParams:
     sort_dir: str = "asc"
     page: int = 1
     per_page: int = 25
+    # Keyset cursor: sort-column value and id of the last row already shown
+    after_value: str | int | datetime | None = None
+    after_id: int | None = None
+    # Compute the exact total and page count (needs a COUNT query)
+    need_total: bool = True
 
 
 VALID_SORT_COLUMNS = {
@@ -40,20 +59,158 @@ VALID_SORT_COLUMNS = {
     "corpus_section": File.corpus_section,
 }
 
+# ORDER BY clauses for each (sort_by, sort_dir), with id as a tiebreaker so
+# keyset cursors are stable; built once instead of per query
+ORDER_CLAUSES = {
+    (name, sort_dir): (direction(column), direction(File.id))
+    for name, column in VALID_SORT_COLUMNS.items()
+    for sort_dir, direction in (("asc", asc), ("desc", desc))
+}
+
+
+def encode_cursor(sort_by: str, sort_dir: str, value, file_id: int) -> str:
+    """Encode the position after a row as an opaque keyset cursor.
+
+    Args:
+        sort_by: Sort column name the cursor applies to.
+        sort_dir: Sort direction the cursor applies to.
+        value: The row's value in the sort column.
+        file_id: The row's id (tiebreaker).
+
+    Returns:
+        URL-safe cursor string.
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_by, sort_dir, value, file_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_dir: str) -> tuple | None:
+    """Decode a keyset cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from the request.
+        sort_by: Current sort column.
+        sort_dir: Current sort direction. Cursors created for a different
+            ordering are ignored.
+
+    Returns:
+        (value, file_id) tuple, or None if the cursor is invalid or stale.
+    """
+    try:
+        cursor_sort, cursor_dir, value, file_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if (cursor_sort, cursor_dir) != (sort_by, sort_dir):
+            return None
+        # The cursor is client-supplied: only accept values SQLite can bind
+        if not _is_sqlite_int(file_id):
+            return None
+        if value is not None and not (
+            isinstance(value, (str, float)) or _is_sqlite_int(value)
+        ):
+            return None
+        if sort_by == "modified_at" and value is not None:
+            if not isinstance(value, str):
+                return None
+            value = datetime.fromisoformat(value)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+    return value, file_id
+
+
+def _is_sqlite_int(value) -> bool:
+    """Whether value is a (non-bool) int that fits a SQLite INTEGER."""
+    return (
+        isinstance(value, int)
+        and not isinstance(value, bool)
+        and SQLITE_INT_MIN <= value <= SQLITE_INT_MAX
+    )
+
+
+def _keyset_segments(sort_column, after_value, after_id: int, descending: bool) -> list:
+    """Filters for rows after (sort_column, id) = (after_value, after_id).
+
+    SQLite sorts NULLs first ascending and last descending, so the rows
+    after a cursor can span both the NULL and the non-NULL part of the
+    ordering. Each part gets its own filter, in sort order, so every query
+    is a range seek on the (sort_column, id) index; OR-ing them together
+    would turn the seek into a scan. NULL parts are only included for
+    nullable columns.
+    """
+    if after_value is None:
+        # Cursor is inside the NULL part
+        in_nulls = and_(sort_column.is_(None), File.id < after_id if descending else File.id > after_id)
+        return [in_nulls] if descending else [in_nulls, sort_column.isnot(None)]
+    if descending:
+        after = tuple_(sort_column, File.id) < tuple_(after_value, after_id)
+        return [after, sort_column.is_(None)] if sort_column.nullable else [after]
+    return [tuple_(sort_column, File.id) > tuple_(after_value, after_id)]
+
+
+@functools.lru_cache(maxsize=4)
+def _fts_available(db_url: str, generation: int, ttl_bucket: int) -> bool:
+    """Return whether the database has the file_fts table.
+
+    Arguments are the cache_key() parts and are only used to key the LRU
+    cache, so a new generation or TTL window checks again.
+    """
+    with db.engine.connect() as conn:
+        return has_file_fts(conn)
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards in value so it matches literally (with ESCAPE '\\')."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _substring_filter(column: Column, value: str):
+    """Case-insensitive substring match on file_name or file_path.
+
+    Uses the file_fts trigram index when it exists and the term is long
+    enough, falling back to ILIKE '%value%' otherwise. Either way value is
+    matched literally: % and _ are not wildcards.
+    """
+    if len(value) >= FTS_MIN_TERM_LENGTH and _fts_available(*cache_key()):
+        phrase = '"' + value.replace('"', '""') + '"'
+        matches = select(file_fts.c.rowid).where(file_fts.c[column.key].op("MATCH")(phrase))
+        return File.id.in_(matches)
+    return column.ilike(f"%{_escape_like(value)}%", escape="\\")
+
 
-def build_query(params: SearchParams) -> Query:
+def _filename_filter(value: str):
+    """Filter on file_name: prefix match for "name*", substring match otherwise.
+
+    The prefix form is a plain LIKE 'name%' (case-insensitive for ASCII in
+    SQLite) that can seek the NOCASE file_name index.
+    """
+    if value.endswith("*") and len(value) > 1:
+        return File.file_name.like(f"{_escape_like(value[:-1])}%", escape="\\")
+    return _substring_filter(File.file_name, value)
+
+
+def _sort_key(params: SearchParams) -> tuple[str, str]:
+    """Return the validated (sort_by, sort_dir) pair for params."""
+    sort_by = params.sort_by if params.sort_by in VALID_SORT_COLUMNS else "file_name"
+    sort_dir = "desc" if params.sort_dir == "desc" else "asc"
+    return sort_by, sort_dir
+
+
+def build_query(params: SearchParams, sort_key: tuple[str, str] | None = None) -> Query:
     """Build a SQLAlchemy query from search parameters.
 
     Args:
         params: SearchParams instance with filter criteria.
+        sort_key: Validated (sort_by, sort_dir) pair; derived from params
+            when omitted.
 
     Returns:
-        SQLAlchemy Query object (not yet executed).
+        SQLAlchemy Query object (not yet executed). A keyset cursor in
+        params is not applied here; execute_search seeks past it.
     """
     query = File.query
 
     if params.filename:
-        query = query.filter(File.file_name.ilike(f"%{params.filename}%"))
+        query = query.filter(_filename_filter(params.filename))
 
     if params.extensions:
         query = query.filter(File.file_extension.in_(params.extensions))
@@ -68,7 +225,7 @@ def build_query(params: SearchParams) -> Query:
         query = query.filter(File.modified_at <= params.date_to)
 
     if params.path_contains:
-        query = query.filter(File.file_path.ilike(f"%{params.path_contains}%"))
+        query = query.filter(_substring_filter(File.file_path, params.path_contains))
 
     if params.min_size is not None:
         query = query.filter(File.file_size_bytes >= params.min_size)
@@ -76,32 +233,118 @@ def build_query(params: SearchParams) -> Query:
     if params.max_size is not None:
         query = query.filter(File.file_size_bytes <= params.max_size)
 
-    # Apply sorting
-    sort_column = VALID_SORT_COLUMNS.get(params.sort_by, File.file_name)
-    if params.sort_dir == "desc":
-        query = query.order_by(desc(sort_column))
-    else:
-        query = query.order_by(asc(sort_column))
+    # Apply sorting; a keyset cursor is applied by execute_search
+    sort_by, sort_dir = sort_key or _sort_key(params)
+    query = query.order_by(*ORDER_CLAUSES[(sort_by, sort_dir)])
 
     return query
 
 
+def _filter_key(params: SearchParams) -> tuple:
+    """Hashable tuple of the filters that determine a search's result set."""
+    return (
+        params.filename,
+        tuple(params.extensions),
+        tuple(params.sections),
+        params.date_from,
+        params.date_to,
+        params.path_contains,
+        params.min_size,
+        params.max_size,
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_count(filters: tuple, db_url: str, generation: int, ttl_bucket: int) -> int:
+    """Count matching files; cached per database, filter set, generation and TTL window."""
+    filename, extensions, sections, date_from, date_to, path_contains, min_size, max_size = filters
+    params = SearchParams(
+        filename=filename,
+        extensions=list(extensions),
+        sections=list(sections),
+        date_from=date_from,
+        date_to=date_to,
+        path_contains=path_contains,
+        min_size=min_size,
+        max_size=max_size,
+    )
+    return build_query(params).order_by(None).count()
+
+
+def count_results(params: SearchParams) -> int:
+    """Return the number of files matching the search filters.
+
+    Results are cached until the indexer bumps the corpus generation or
+    app.cache.CACHE_TTL seconds pass.
+
+    Args:
+        params: SearchParams instance with filter criteria.
+
+    Returns:
+        Total number of matching files.
+    """
+    return _cached_count(_filter_key(params), *cache_key())
+
+
+def _rows_after_cursor(query: Query, params: SearchParams, sort_by: str, sort_dir: str) -> list[File]:
+    """Fetch up to per_page + 1 rows after the keyset cursor in params.
+
+    The segments from _keyset_segments are read in order, and a later one
+    only when the earlier ones come back short of a page.
+    """
+    limit = params.per_page + 1
+    rows: list[File] = []
+    for segment in _keyset_segments(
+        VALID_SORT_COLUMNS[sort_by], params.after_value, params.after_id, sort_dir == "desc"
+    ):
+        rows.extend(query.filter(segment).limit(limit - len(rows)).all())
+        if len(rows) == limit:
+            break
+    return rows
+
+
 def execute_search(params: SearchParams) -> dict:
     """Execute a search and return paginated results.
 
+    With a keyset cursor (params.after_id set) the rows after the cursor
+    are fetched directly; otherwise OFFSET/LIMIT pagination by page number
+    is used. The total is only computed (and cached) when params.need_total
+    is set and no cursor is given; otherwise one extra row is fetched to
+    tell whether more results exist.
+
     Args:
         params: SearchParams instance with filter criteria.
 
     Returns:
-        Dictionary with keys: items (list of File), total, page, per_page,
-        pages (total number of pages).
+        Dictionary with keys: files (list of File), total, page, per_page,
+        pages (total number of pages), has_more, and next_cursor (cursor for
+        the following rows, or None). total and pages are None when no
+        total was computed, and page is None for cursor requests.
     """
-    query = build_query(params)
-    total = query.count()
-    pages = max(1, (total + params.per_page - 1) // params.per_page)
-    page = min(params.page, pages)
+    sort_by, sort_dir = _sort_key(params)
+    query = build_query(params, (sort_by, sort_dir))
+
+    if params.after_id is not None or not params.need_total:
+        if params.after_id is not None:
+            page = None
+            rows = _rows_after_cursor(query, params, sort_by, sort_dir)
+        else:
+            page = params.page
+            rows = query.offset((page - 1) * params.per_page).limit(params.per_page + 1).all()
+        has_more = len(rows) > params.per_page
+        files = rows[: params.per_page]
+        total = pages = None
+    else:
+        total = count_results(params)
+        pages = max(1, (total + params.per_page - 1) // params.per_page)
+        page = min(params.page, pages)
+        files = query.offset((page - 1) * params.per_page).limit(params.per_page).all()
+        has_more = page < pages
 
-    files = query.offset((page - 1) * params.per_page).limit(params.per_page).all()
+    next_cursor = None
+    if files and has_more:
+        last = files[-1]
+        next_cursor = encode_cursor(sort_by, sort_dir, getattr(last, sort_by), last.id)
 
     return {
         "files": files,
@@ -109,9 +352,67 @@ def execute_search(params: SearchParams) -> dict:
         "page": page,
         "per_page": params.per_page,
         "pages": pages,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
     }
 
 
+def execute_search_stream(params: SearchParams, limit: int) -> Iterator[File]:
+    """Stream up to limit matching files without pagination or a COUNT.
+
+    Args:
+        params: SearchParams instance with filter criteria; per_page and
+            page are ignored.
+        limit: Maximum number of files to return.
+
+    Returns:
+        Iterator over File instances in the requested sort order.
+    """
+    return iter(build_query(params).limit(limit).yield_per(200))
+
+
+def _as_list(args: dict, key: str) -> list[str]:
+    """Return the non-empty values of a repeatable query parameter."""
+    values = args.getlist(key) if hasattr(args, "getlist") else args.get(key, [])
+    if isinstance(values, str):
+        values = [values]
+    return [v for v in values if v]
+
+
+def _parse_text(value: str) -> str:
+    return value.strip()
+
+
+# Cheap shape checks so malformed input is rejected without raising
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _parse_datetime(value: str) -> datetime | None:
+    value = value.strip()
+    if not _ISO_DATE_RE.match(value):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:  # e.g. an out-of-range month or day
+        return None
+
+
+def _parse_int(value: str) -> int | None:
+    return to_int(value.strip())
+
+
+# Single-valued query parameters and how to parse them; an empty or
+# unparseable value leaves the filter unset.
+_SCALAR_FIELDS = (
+    ("filename", _parse_text),
+    ("path_contains", _parse_text),
+    ("date_from", _parse_datetime),
+    ("date_to", _parse_datetime),
+    ("min_size", _parse_int),
+    ("max_size", _parse_int),
+)
+
+
 def parse_search_params(args: dict) -> SearchParams:
     """Parse search parameters from a request args dict.
 
@@ -123,46 +424,11 @@ def parse_search_params(args: dict) -> SearchParams:
     """
     params = SearchParams()
 
-    params.filename = args.get("filename", "").strip()
-    params.path_contains = args.get("path_contains", "").strip()
-
-    extensions = args.getlist("extension") if hasattr(args, "getlist") else args.get("extension", [])
-    if isinstance(extensions, str):
-        extensions = [extensions] if extensions else []
-    params.extensions = [e for e in extensions if e]
-
-    sections = args.getlist("section") if hasattr(args, "getlist") else args.get("section", [])
-    if isinstance(sections, str):
-        sections = [sections] if sections else []
-    params.sections = [s for s in sections if s]
-
-    date_from = args.get("date_from", "").strip()
-    if date_from:
-        try:
-            params.date_from = datetime.fromisoformat(date_from)
-        except ValueError:
-            pass
-
-    date_to = args.get("date_to", "").strip()
-    if date_to:
-        try:
-            params.date_to = datetime.fromisoformat(date_to)
-        except ValueError:
-            pass
-
-    min_size = args.get("min_size", "").strip()
-    if min_size:
-        try:
-            params.min_size = int(min_size)
-        except ValueError:
-            pass
-
-    max_size = args.get("max_size", "").strip()
-    if max_size:
-        try:
-            params.max_size = int(max_size)
-        except ValueError:
-            pass
+    for name, parse in _SCALAR_FIELDS:
+        setattr(params, name, parse(args.get(name, "")))
+
+    params.extensions = _as_list(args, "extension")
+    params.sections = _as_list(args, "section")
 
     params.sort_by = args.get("sort_by", "file_name")
     if params.sort_by not in VALID_SORT_COLUMNS:
@@ -172,14 +438,17 @@ def parse_search_params(args: dict) -> SearchParams:
     if params.sort_dir not in ("asc", "desc"):
         params.sort_dir = "asc"
 
-    try:
-        params.page = max(1, int(args.get("page", 1)))
-    except (ValueError, TypeError):
-        params.page = 1
+    after = args.get("after", "").strip()
+    if after:
+        decoded = decode_cursor(after, params.sort_by, params.sort_dir)
+        if decoded is not None:
+            params.after_value, params.after_id = decoded
 
-    try:
-        params.per_page = min(100, max(1, int(args.get("per_page", 25))))
-    except (ValueError, TypeError):
-        params.per_page = 25
+    per_page = to_int(str(args.get("per_page", "")).strip())
+    params.per_page = min(MAX_PER_PAGE, max(1, per_page)) if per_page is not None else 25
+
+    # Capped so the OFFSET computed from it still fits a SQLite INTEGER
+    page = to_int(str(args.get("page", "")).strip())
+    params.page = min(MAX_PAGE, max(1, page)) if page is not None else 1
 
     return params
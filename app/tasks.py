@@ -0,0 +1,92 @@
+"""Background execution of consolidation jobs.
+
+Jobs run on a small in-process thread pool, so the request that starts an
+export returns immediately while the job row tracks its progress.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask
+
+from app.consolidator import FORMAT_HANDLERS, consolidate_files
+from app.models import ConsolidationJob, db
+
+logger = logging.getLogger(__name__)
+
+# Exports are mostly I/O and all write to one SQLite file; two workers suffice
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kcm-consolidate")
+
+
+def _run_consolidation(
+    app: Flask,
+    job_id: int,
+    file_ids: list[int],
+    output_format: str,
+    name: str,
+    output_dir: str,
+    query_params_json: str,
+) -> None:
+    """Complete a pending job, marking it failed if the export raises."""
+    with app.app_context():
+        try:
+            consolidate_files(
+                file_ids=file_ids,
+                output_format=output_format,
+                name=name,
+                db_session=db.session,
+                output_dir=output_dir,
+                query_params_json=query_params_json,
+                job_id=job_id,
+            )
+        except Exception:
+            logger.exception("Consolidation job %s failed", job_id)
+            db.session.rollback()
+            job = db.session.get(ConsolidationJob, job_id)
+            if job is not None:
+                job.status = "failed"
+                db.session.commit()
+
+
+def submit_consolidation(
+    app: Flask,
+    file_ids: list[int],
+    output_format: str,
+    name: str,
+    output_dir: str,
+    query_params_json: str = "{}",
+) -> ConsolidationJob:
+    """Record a pending consolidation job and run it in the background.
+
+    Must be called within an application context.
+
+    Args:
+        app: The application the background job runs under.
+        file_ids: List of File record IDs to include.
+        output_format: One of "markdown", "json", "text".
+        name: User-provided label for this job.
+        output_dir: Directory where output files are written.
+        query_params_json: JSON string of the search criteria used.
+
+    Returns:
+        The pending ConsolidationJob instance.
+
+    Raises:
+        ValueError: If output_format is not supported.
+    """
+    if output_format not in FORMAT_HANDLERS:
+        raise ValueError(f"Unsupported format: {output_format}. Choose from: {list(FORMAT_HANDLERS.keys())}")
+
+    job = ConsolidationJob(
+        name=name,
+        query_params=query_params_json,
+        output_format=output_format,
+        status="pending",
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    _executor.submit(
+        _run_consolidation, app, job.id, file_ids, output_format, name, output_dir, query_params_json
+    )
+    return job
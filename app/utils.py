@@ -0,0 +1,47 @@
+"""Small shared helpers for Knowledge Corpus Manager."""
+
+from itertools import islice
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# Keeps IN (...) lists well under SQLite's host-parameter limit
+IN_CLAUSE_CHUNK_SIZE = 500
+
+# Range of a SQLite INTEGER; larger Python ints cannot be bound
+SQLITE_INT_MIN = -(2**63)
+SQLITE_INT_MAX = 2**63 - 1
+
+
+def chunked(items: Iterable[T], size: int = IN_CLAUSE_CHUNK_SIZE) -> Iterator[list[T]]:
+    """Split an iterable into lists of at most size items.
+
+    Args:
+        items: Values to split.
+        size: Maximum chunk length.
+
+    Yields:
+        Consecutive lists of items.
+    """
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def to_int(value: str) -> int | None:
+    """Parse a query-string integer without raising.
+
+    Args:
+        value: Optionally signed decimal digits.
+
+    Returns:
+        The integer, or None if value is malformed or outside the SQLite
+        INTEGER range (so it can always be bound as a parameter).
+    """
+    digits = value[1:] if value[:1] in ("-", "+") else value
+    # 19 digits covers the INTEGER range; also stays far below int()'s
+    # digit limit for huge inputs
+    if not digits.isdecimal() or len(digits) > 19:
+        return None
+    number = int(value)
+    return number if SQLITE_INT_MIN <= number <= SQLITE_INT_MAX else None
@@ -9,9 +9,10 @@ import sys
 import click
 
 from app import create_app
+from app.cache import corpus_stats
 from app.models import File, db
 from app.indexer import index_corpus, reindex_changed
-from app.search import SearchParams, execute_search
+from app.search import SearchParams, execute_search_stream
 from app.consolidator import consolidate_files
 
 
@@ -34,8 +35,11 @@ def index(incremental: bool):
             sys.exit(1)
 
         indexer_config = app.config["KCM"].get("indexer", {})
-        skip_patterns = indexer_config.get("skip_patterns")
+        skip_patterns = indexer_config.get(
+            "skip_patterns_compiled", indexer_config.get("skip_patterns")
+        )
         supported_extensions = indexer_config.get("supported_extensions")
+        parallel_hash = indexer_config.get("parallel_hash", True)
 
         if incremental:
             click.echo(f"Running incremental reindex of: {corpus_root}")
@@ -44,6 +48,7 @@ def index(incremental: bool):
                 db_session=db.session,
                 skip_patterns=skip_patterns,
                 supported_extensions=supported_extensions,
+                parallel_hash=parallel_hash,
             )
         else:
             click.echo(f"Running full index of: {corpus_root}")
@@ -52,6 +57,7 @@ def index(incremental: bool):
                 db_session=db.session,
                 skip_patterns=skip_patterns,
                 supported_extensions=supported_extensions,
+                parallel_hash=parallel_hash,
             )
 
         click.echo(f"\nIndex complete:")
@@ -64,35 +70,24 @@ def stats():
     """Show index statistics."""
     app = create_app()
     with app.app_context():
-        from sqlalchemy import func
-
-        total = db.session.query(func.count(File.id)).scalar() or 0
-        total_size = db.session.query(func.sum(File.file_size_bytes)).scalar() or 0
-        last_indexed = db.session.query(func.max(File.indexed_at)).scalar()
+        stats = corpus_stats()
+        total = stats["total_files"]
+        total_size = stats["total_size"]
+        last_indexed = stats["last_indexed"]
 
         click.echo(f"Total indexed files: {total}")
         click.echo(f"Total size: {total_size:,} bytes")
         click.echo(f"Last indexed: {last_indexed or 'never'}")
 
         # Extension breakdown
-        ext_counts = (
-            db.session.query(File.file_extension, func.count(File.id))
-            .group_by(File.file_extension)
-            .order_by(func.count(File.id).desc())
-            .all()
-        )
+        ext_counts = stats["ext_counts"]
         if ext_counts:
             click.echo("\nFiles by extension:")
             for ext, count in ext_counts:
                 click.echo(f"  {ext}: {count}")
 
         # Section breakdown
-        section_counts = (
-            db.session.query(File.corpus_section, func.count(File.id))
-            .group_by(File.corpus_section)
-            .order_by(func.count(File.id).desc())
-            .all()
-        )
+        section_counts = stats["section_counts"]
         if section_counts:
             click.echo("\nFiles by section:")
             for section, count in section_counts:
@@ -116,7 +111,6 @@ def search(name: str, ext: str, section: str, after: str, before: str, limit: in
             filename=name,
             extensions=[ext] if ext else [],
             sections=[section] if section else [],
-            per_page=limit,
         )
 
         if after:
@@ -133,14 +127,14 @@ def search(name: str, ext: str, section: str, after: str, before: str, limit: in
                 click.echo(f"Invalid date format for --before: {before}", err=True)
                 sys.exit(1)
 
-        results = execute_search(params)
+        files = list(execute_search_stream(params, limit))
 
-        if not results["files"]:
+        if not files:
             click.echo("No matching files found.")
             return
 
-        click.echo(f"Found {results['total']} files (showing {len(results['items'])}):\n")
-        for f in results["files"]:
+        click.echo(f"Showing {len(files)} files (limit {limit}):\n")
+        for f in files:
             modified = f.modified_at.strftime("%Y-%m-%d") if f.modified_at else "unknown"
             click.echo(f"  [{f.file_extension}] {f.file_path}  ({modified})")
 
@@ -154,18 +148,18 @@ def consolidate(name: str, section: str, ext: str, output_format: str):
     """Consolidate search results into an export file."""
     app = create_app()
     with app.app_context():
-        query = File.query
+        # Only the IDs are needed; stream them instead of loading full rows
+        query = db.session.query(File.id)
         if section:
             query = query.filter(File.corpus_section == section)
         if ext:
             query = query.filter(File.file_extension == ext)
 
-        files = query.all()
-        if not files:
+        file_ids = [row.id for row in query.yield_per(1000)]
+        if not file_ids:
             click.echo("No matching files found.")
             return
 
-        file_ids = [f.id for f in files]
         output_dir = app.config["KCM"]["consolidation"]["output_dir"]
 
         query_params = {"section": section, "ext": ext, "source": "cli"}
@@ -1,16 +1,62 @@
 """Database initialization script for Knowledge Corpus Manager.
 
-Creates the SQLite database and all required tables.
+Creates the SQLite database and all required tables, and adds any
+missing columns, indexes and the filename full-text index to an existing
+database.
 """
 
+import os
 from pathlib import Path
 
+from sqlalchemy import Connection, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateColumn
+
 from app import create_app
-from app.models import db
+from app.models import create_file_fts, db
+
+# Indexes created by earlier schema versions and since replaced
+OBSOLETE_INDEXES = (
+    "ix_files_corpus_section",  # now ix_files_corpus_section_id
+)
+
+
+def normalize_path_separators(conn: Connection, sep: str = os.sep) -> int:
+    """Rewrite file_path/parent_dir values stored with sep to use "/".
+
+    Older versions stored paths with os.sep, while the indexer now always
+    uses "/". A "/" row that a reindex already added for the same file is
+    dropped so the original row (and its tags) keeps its id.
+
+    Args:
+        conn: Connection to run the migration on.
+        sep: Separator the old rows were stored with.
+
+    Returns:
+        Number of rows rewritten.
+    """
+    if sep == "/":
+        return 0
+    params = {"sep": sep}
+    duplicates = (
+        "SELECT f.id FROM files f JOIN files o"
+        " ON instr(o.file_path, :sep) > 0 AND replace(o.file_path, :sep, '/') = f.file_path"
+    )
+    conn.execute(text(f"DELETE FROM file_tags WHERE file_id IN ({duplicates})"), params)
+    conn.execute(text(f"DELETE FROM files WHERE id IN ({duplicates})"), params)
+    result = conn.execute(
+        text(
+            "UPDATE files SET file_path = replace(file_path, :sep, '/'),"
+            " parent_dir = replace(parent_dir, :sep, '/')"
+            " WHERE instr(file_path, :sep) > 0 OR instr(parent_dir, :sep) > 0"
+        ),
+        params,
+    )
+    return result.rowcount
 
 
 def setup_database() -> None:
-    """Create the database file and all tables."""
+    """Create the database file, all tables, and any missing indexes."""
     app = create_app()
 
     with app.app_context():
@@ -19,6 +65,44 @@ def setup_database() -> None:
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
         db.create_all()
+
+        # create_all() doesn't alter existing tables either, so add any
+        # columns declared since then (each needs a server default or NULLs).
+        inspector = inspect(db.engine)
+        with db.engine.begin() as conn:
+            for table in db.metadata.sorted_tables:
+                existing = {c["name"] for c in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in existing:
+                        column_ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+                        conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}")
+
+        with db.engine.begin() as conn:
+            migrated = normalize_path_separators(conn)
+        if migrated:
+            print(f"Converted {migrated} stored paths to '/' separators.")
+
+        # create_all() skips existing tables, so add any indexes declared
+        # since the database was first created.
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=db.engine, checkfirst=True)
+
+        # ...and drop indexes the models no longer declare
+        with db.engine.begin() as conn:
+            for name in OBSOLETE_INDEXES:
+                conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+        try:
+            with db.engine.begin() as conn:
+                create_file_fts(conn)
+        except OperationalError as e:
+            print(f"Full-text index not created ({e}); substring search will use LIKE.")
+
+        # Refresh planner statistics so SQLite picks the search indexes
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+
         print(f"Database created at: {db_path}")
         print("All tables initialized successfully.")
 
@@ -0,0 +1,21 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+from app import create_app
+from app.models import db
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Application backed by an empty database in a temporary directory."""
+    monkeypatch.setenv("KCM_DATABASE_PATH", str(tmp_path / "corpus.db"))
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
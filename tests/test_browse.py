@@ -0,0 +1,32 @@
+"""Tests for the corpus browser."""
+
+from app.models import File, db
+from app.routes.browse import _get_tree_entries
+
+
+def test_tree_entries_list_only_this_directory(app):
+    paths = ["A/x/1.md", "A/x/y/2.md", "A/x/😀/3.md", "A/x0/4.md", "A/X/5.md", "B/6.md"]
+    with app.app_context():
+        for path in paths:
+            parent_dir, name = path.rsplit("/", 1)
+            db.session.add(
+                File(
+                    file_path=path,
+                    file_name=name,
+                    file_extension=".md",
+                    file_size_bytes=1,
+                    parent_dir=parent_dir,
+                )
+            )
+        db.session.commit()
+
+        entries = _get_tree_entries("A/x")
+        assert [(d["name"], d["file_count"]) for d in entries["directories"]] == [("y", 1), ("😀", 1)]
+        assert [f.file_name for f in entries["files"]] == ["1.md"]
+
+        entries = _get_tree_entries("A")
+        assert [d["name"] for d in entries["directories"]] == ["X", "x", "x0"]
+
+
+def test_detail_of_out_of_range_file_is_not_found(client):
+    assert client.get("/browse/file/1000000000000000000000000000000").status_code == 404
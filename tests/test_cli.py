@@ -0,0 +1,33 @@
+"""Tests for the command-line interface."""
+
+from click.testing import CliRunner
+
+from app import create_app
+from app.models import File, db
+from cli import cli
+
+
+def _make_db(path, monkeypatch, file_count: int) -> None:
+    monkeypatch.setenv("KCM_DATABASE_PATH", str(path))
+    with create_app().app_context():
+        db.create_all()
+        for i in range(file_count):
+            db.session.add(
+                File(
+                    file_path=f"f{i}.md",
+                    file_name=f"f{i}.md",
+                    file_extension=".md",
+                    file_size_bytes=1,
+                    parent_dir="",
+                )
+            )
+        db.session.commit()
+
+
+def test_each_command_uses_current_environment(tmp_path, monkeypatch):
+    runner = CliRunner()
+    for name, file_count in (("one.db", 1), ("two.db", 2)):
+        _make_db(tmp_path / name, monkeypatch, file_count)
+        result = runner.invoke(cli, ["stats"])
+        assert result.exit_code == 0, result.output
+        assert f"Total indexed files: {file_count}" in result.output
@@ -0,0 +1,16 @@
+"""Tests for the consolidation routes."""
+
+BIG = "1000000000000000000000000000000"
+
+
+def test_history_ignores_out_of_range_before_id(client):
+    response = client.get(f"/consolidate/history?before=2024-01-01T00:00:00&before_id={BIG}")
+    assert response.status_code == 200
+
+
+def test_form_ignores_out_of_range_file_ids(client):
+    assert client.get(f"/consolidate/?file_ids={BIG}").status_code == 200
+
+
+def test_download_of_out_of_range_job_is_not_found(client):
+    assert client.get(f"/consolidate/download/{BIG}").status_code == 404
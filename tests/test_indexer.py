@@ -0,0 +1,39 @@
+"""Tests for corpus indexing."""
+
+import pytest
+
+from app import indexer
+from app.indexer import index_corpus
+from app.models import File, db
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / "corpus"
+    (root / "Notes").mkdir(parents=True)
+    for i in range(10):
+        (root / "Notes" / f"note{i:02}.md").write_text(f"note {i}")
+    return root
+
+
+@pytest.mark.parametrize("parallel_hash", [True, False])
+def test_interrupted_run_keeps_committed_slices(app, corpus, monkeypatch, parallel_hash):
+    monkeypatch.setattr(indexer, "COMMIT_BATCH_SIZE", 4)
+    real_safe_hash = indexer._safe_hash
+
+    def failing_hash(meta):
+        if meta["file_name"] == "note09.md":
+            raise KeyboardInterrupt
+        return real_safe_hash(meta)
+
+    monkeypatch.setattr(indexer, "_safe_hash", failing_hash)
+    with app.app_context():
+        with pytest.raises(KeyboardInterrupt):
+            index_corpus(str(corpus), db.session, parallel_hash=parallel_hash)
+        db.session.rollback()
+        assert db.session.query(File).count() == 8
+
+        monkeypatch.setattr(indexer, "_safe_hash", real_safe_hash)
+        stats = index_corpus(str(corpus), db.session, parallel_hash=parallel_hash)
+        assert (stats["new"], stats["unchanged"]) == (2, 8)
+        assert db.session.query(File).count() == 10
@@ -0,0 +1,131 @@
+"""Tests for search parameter parsing and keyset cursors."""
+
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from app.models import File, create_file_fts, db
+from app.search import (
+    ORDER_CLAUSES,
+    SearchParams,
+    build_query,
+    decode_cursor,
+    encode_cursor,
+    execute_search,
+)
+
+
+def _raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("file_name", "asc", "report.md", 42)
+    assert decode_cursor(cursor, "file_name", "asc") == ("report.md", 42)
+
+
+def test_cursor_for_other_ordering_is_ignored():
+    cursor = encode_cursor("file_name", "asc", "report.md", 42)
+    assert decode_cursor(cursor, "file_name", "desc") is None
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        ["file_name", "asc", {"x": 1}, 3],
+        ["file_name", "asc", "a", 10**30],
+    ],
+)
+def test_cursor_with_unbindable_values_is_rejected(payload, client):
+    assert decode_cursor(_raw_cursor(payload), "file_name", "asc") is None
+    response = client.get("/search/results", query_string={"after": _raw_cursor(payload)})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("value", [20240101, "yesterday", ["2024-01-01"]])
+def test_modified_at_cursor_needs_iso_string(value):
+    cursor = _raw_cursor(["modified_at", "desc", value, 3])
+    assert decode_cursor(cursor, "modified_at", "desc") is None
+
+
+def test_next_cursor_uses_validated_sort(app):
+    with app.app_context():
+        for i in range(3):
+            db.session.add(
+                File(
+                    file_path=f"d/f{i}.md",
+                    file_name=f"f{i}.md",
+                    file_extension=".md",
+                    file_size_bytes=i,
+                    parent_dir="d",
+                )
+            )
+        db.session.commit()
+        results = execute_search(SearchParams(sort_by="bogus", sort_dir="sideways", per_page=2))
+        assert decode_cursor(results["next_cursor"], "file_name", "asc") == ("f1.md", 2)
+
+
+@pytest.mark.parametrize(("sort_by", "sort_dir"), sorted(ORDER_CLAUSES))
+def test_cursor_pages_join_up_to_full_result(app, sort_by, sort_dir):
+    with app.app_context():
+        # Repeated sort values and NULL modified_at / corpus_section rows
+        for i in range(23):
+            db.session.add(
+                File(
+                    file_path=f"d{i % 3}/f{i}.md",
+                    file_name=f"f{i % 4}.md",
+                    file_extension=(".md", ".txt")[i % 2],
+                    file_size_bytes=i % 5,
+                    parent_dir=f"d{i % 3}",
+                    modified_at=None if i % 3 == 0 else datetime(2024, 1, 1 + i % 6),
+                    corpus_section=None if i % 4 == 0 else f"s{i % 2}",
+                )
+            )
+        db.session.commit()
+
+        params = SearchParams(sort_by=sort_by, sort_dir=sort_dir, per_page=4, need_total=False)
+        expected = [f.id for f in build_query(params).all()]
+
+        seen = []
+        while True:
+            results = execute_search(params)
+            seen.extend(f.id for f in results["files"])
+            if not results["next_cursor"]:
+                break
+            params.after_value, params.after_id = decode_cursor(results["next_cursor"], sort_by, sort_dir)
+        assert seen == expected
+
+
+@pytest.mark.parametrize("with_fts", [False, True])
+@pytest.mark.parametrize(
+    ("term", "expected"),
+    [("_b", ["a_b.md"]), ("a_b", ["a_b.md"]), ("%", ["50%.md"]), ("0%", ["50%.md"])],
+)
+def test_filename_substring_is_literal(app, with_fts, term, expected):
+    with app.app_context():
+        for name in ("a_b.md", "axb.md", "50%.md", "500.md"):
+            db.session.add(
+                File(file_path=name, file_name=name, file_extension=".md", file_size_bytes=1, parent_dir="")
+            )
+        db.session.commit()
+        if with_fts:
+            with db.engine.begin() as conn:
+                create_file_fts(conn)
+        files = execute_search(SearchParams(filename=term))["files"]
+        assert [f.file_name for f in files] == expected
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "min_size=1000000000000000000000000000000",
+        "max_size=-1000000000000000000000000000000",
+        "per_page=1000000000000000000000000000000",
+        "page=1000000000000000000000000000000",
+        "page=9223372036854775807",
+    ],
+)
+def test_out_of_range_ints_do_not_error(query, client):
+    assert client.get(f"/search/results?{query}", headers={"HX-Request": "true"}).status_code == 200
@@ -0,0 +1,45 @@
+"""Tests for database migrations in setup_db."""
+
+from app.models import File, Tag, db
+from setup_db import normalize_path_separators
+
+
+def _file(path: str, parent_dir: str) -> File:
+    return File(
+        file_path=path,
+        file_name=path.rsplit("/", 1)[-1].rsplit("\\", 1)[-1],
+        file_extension=".md",
+        file_size_bytes=1,
+        parent_dir=parent_dir,
+    )
+
+
+def test_backslash_paths_are_rewritten_in_place(app):
+    with app.app_context():
+        old = _file("Notes\\2024\\a.md", "Notes\\2024")
+        old.tags.append(Tag(name="keep"))
+        duplicate = _file("Notes/2024/a.md", "Notes/2024")
+        other = _file("Notes\\b.md", "Notes")
+        db.session.add_all([old, duplicate, other])
+        db.session.commit()
+        old_id, other_id = old.id, other.id
+
+        with db.engine.begin() as conn:
+            assert normalize_path_separators(conn, "\\") == 2
+        db.session.expire_all()
+
+        rows = {f.file_path: f for f in File.query}
+        assert set(rows) == {"Notes/2024/a.md", "Notes/b.md"}
+        assert rows["Notes/2024/a.md"].id == old_id
+        assert rows["Notes/2024/a.md"].parent_dir == "Notes/2024"
+        assert [t.name for t in rows["Notes/2024/a.md"].tags] == ["keep"]
+        assert rows["Notes/b.md"].id == other_id
+
+
+def test_posix_separator_is_a_no_op(app):
+    with app.app_context():
+        db.session.add(_file("odd\\name.md", ""))
+        db.session.commit()
+        with db.engine.begin() as conn:
+            assert normalize_path_separators(conn, "/") == 0
+        assert File.query.one().file_path == "odd\\name.md"
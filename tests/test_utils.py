@@ -0,0 +1,26 @@
+"""Tests for the shared helpers."""
+
+import pytest
+
+from app.utils import SQLITE_INT_MAX, SQLITE_INT_MIN, to_int
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("42", 42),
+        ("-7", -7),
+        ("+7", 7),
+        (str(SQLITE_INT_MAX), SQLITE_INT_MAX),
+        (str(SQLITE_INT_MIN), SQLITE_INT_MIN),
+        (str(SQLITE_INT_MAX + 1), None),
+        (str(SQLITE_INT_MIN - 1), None),
+        ("9" * 5000, None),
+        ("", None),
+        ("-", None),
+        ("1.5", None),
+        ("abc", None),
+    ],
+)
+def test_to_int(value, expected):
+    assert to_int(value) == expected